@@ -1,17 +1,18 @@
 import asyncio, uuid, os, shutil,time
 from pathlib import Path
 from .logger import get_logger
-from fastapi import FastAPI, Form, Request, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import FastAPI, Form, Query, Request, UploadFile, File, HTTPException, BackgroundTasks
 from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from .chatbot import invoke as _invoke
+from .chatbot import invoke as _invoke, retrieval_stats
 from fastapi.templating import Jinja2Templates
 from .helper_folder.helper_function import process_video_pipeline, ingest_pdf
 from .helper_folder.job_status import JOB_STATUS, JOB_TIMEOUT
+from .helper_folder.document_store import list_documents, delete_document, reingest_document, compact_store, source_files, is_safe_id
+from .config import settings
+from .static_cache import StaticCache
 from .helper_folder.job_status import JOB_STATUS
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pathlib import Path
 
@@ -30,24 +31,33 @@ STATIC_DIR = Path(__file__).parent / "static"
 
 templates_dir = Path(__file__).parent.parent/ "templates" 
 templates = Jinja2Templates(directory=str(templates_dir))
+
+# Build assets, index.html and the chat template are loaded, precompressed
+# and rendered once at startup, then served from memory
+assets_cache = StaticCache()
+assets_cache.add_directory(STATIC_DIR / "assets")
+pages_cache = StaticCache()
+pages_cache.add_file("index.html", STATIC_DIR / "index.html")
+pages_cache.add_html("chatbot.html", templates.get_template("chatbot.html").render(
+    title="Video Analyzer Chatbot"
+))
+
 # Serve React assets
-app.mount(
-    "/assets",
-    StaticFiles(directory=STATIC_DIR / "assets"),
-    name="assets"
-)
+@app.api_route("/assets/{path:path}", methods=["GET", "HEAD"])
+async def serve_asset(path: str, request: Request):
+    cached = assets_cache.get(path)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return cached.response(request)
 
 # Serve React app
-@app.get("/")
-async def serve_frontend():
-    return FileResponse(STATIC_DIR / "index.html")
+@app.api_route("/", methods=["GET", "HEAD"])
+async def serve_frontend(request: Request):
+    return pages_cache.get("index.html").response(request)
 
-@app.get("/html", response_class=HTMLResponse)
+@app.api_route("/html", methods=["GET", "HEAD"], response_class=HTMLResponse)
 async def chat_ui(request: Request):
-    return templates.TemplateResponse("chatbot.html", {
-        "request": request,
-        "title": "Video Analyzer Chatbot"
-    })
+    return pages_cache.get("chatbot.html").response(request)
 # Configuration
 UPLOAD_FOLDER = os.path.join(os.getcwd(), 'Videos')
 PDF_FOLDER = os.path.join(os.getcwd(), 'PDFs')
@@ -210,9 +220,81 @@ async def chat(request: Request):
                 "session_id": session_id
             }, status_code=200)
         
+@app.get("/metrics/retrieval")
+async def get_retrieval_metrics():
+    return retrieval_stats()
+
+@app.get("/documents")
+async def get_documents():
+    loop = asyncio.get_running_loop()
+    documents = await loop.run_in_executor(None, list_documents)
+    return {"documents": documents}
+
+@app.delete("/documents/{doc_id}")
+async def remove_document(doc_id: str):
+    """Delete a document's chunks, source files and transcript PDF"""
+    if not is_safe_id(doc_id):
+        raise HTTPException(status_code=404, detail="Document not found")
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(None, delete_document, doc_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return {"success": True, **result}
+
+@app.post("/documents/{doc_id}/reingest")
+async def reingest(doc_id: str, background_tasks: BackgroundTasks = BackgroundTasks()):
+    """Re-embed a document from its source files in the background"""
+    if not is_safe_id(doc_id) or not source_files(doc_id):
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    job_id = str(uuid.uuid4())
+    JOB_STATUS[job_id] = {
+        "status": "processing",
+        "started_at": time.time(),
+        "message": "Re-ingest started"
+    }
+    background_tasks.add_task(reingest_document, doc_id, job_id)
+    return {
+        "success": True,
+        "job_id": job_id,
+        "message": "Re-ingest started."
+    }
+
+@app.post("/documents/compact")
+async def compact(max_age_days: float = Query(None, ge=0), max_bytes: int = Query(None, ge=0)):
+    """Run the retention policy now; query params override the configured limits"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, compact_store, max_age_days, max_bytes)
+
+_compaction_task = None
+
+async def _compaction_loop():
+    while True:
+        await asyncio.sleep(settings.COMPACTION_INTERVAL)
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, compact_store)
+        except Exception as e:
+            _logger.error(f"Compaction failed: {str(e)}")
+
+@app.on_event("startup")
+async def start_compaction():
+    global _compaction_task
+    if settings.COMPACTION_INTERVAL > 0 and (settings.RETENTION_MAX_AGE_DAYS or settings.RETENTION_MAX_BYTES):
+        # Keep a strong reference; the event loop only holds tasks weakly
+        _compaction_task = asyncio.create_task(_compaction_loop())
+        _logger.info(f"Compaction job scheduled every {settings.COMPACTION_INTERVAL}s")
+
+@app.on_event("shutdown")
+async def stop_compaction():
+    global _compaction_task
+    if _compaction_task is not None:
+        _compaction_task.cancel()
+        _compaction_task = None
+
 # (optional) React Router support
-@app.get("/{path:path}")
-async def react_router(path: str):
-    return FileResponse(STATIC_DIR / "index.html")
+@app.api_route("/{path:path}", methods=["GET", "HEAD"])
+async def react_router(path: str, request: Request):
+    return pages_cache.get("index.html").response(request)
 
         
\ No newline at end of file
@@ -1,26 +1,27 @@
 """
 RAG orchestration: retriever, prompt and chain.
 
-Expose `invoke(query)` and `restart_chatbot()` for callers.
+Expose `invoke(query)`, `restart_chatbot()` and `retrieval_stats()` for
+callers. Retrieval goes through a `QueryBatcher` so concurrent requests
+share one embedding forward pass and one vector query.
 """
 
 from langchain_community.vectorstores import Chroma
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda, RunnablePassthrough
 from langchain_core.prompts import PromptTemplate
 from langchain_core.callbacks import StdOutCallbackHandler
 from .llm import GeminiLLM
 from .config import settings
-
-# from .embedding_wrapper import CachedEmbeddingFunction
-# cached_embeddings = CachedEmbeddingFunction()
-cached_embeddings = None  # <-- keep as-is if already defined elsewhere
+from .query_batcher import QueryBatcher
+from .helper_folder.ingest_pdf import embeddings
 
 # -----------------------------
 # Internal mutable state
 # -----------------------------
 _db = None
-_retriever = None
 _rag_chain = None
+_TOP_K = 3
 
 # -----------------------------
 # Prompt template
@@ -58,6 +59,47 @@ prompt = PromptTemplate(
     input_variables=["context", "question"],
 )
 
+# -----------------------------
+# Batched retrieval
+# -----------------------------
+def _query_by_vectors(db, vectors):
+    """
+    Run one Chroma query for several embeddings.
+    LangChain's public Chroma API only searches one vector at a time, so
+    this goes through the underlying collection.
+    """
+    return db._collection.query(
+        query_embeddings=vectors,
+        n_results=_TOP_K,
+        include=["documents", "metadatas"],
+    )
+
+
+def _search(queries):
+    """
+    Embed all queries in one forward pass and run one vector query.
+    Returns the top-k documents for each query, in order.
+    """
+    # restart_chatbot() may reset _db from another thread; read it once
+    db = _db
+    if db is None:
+        _init_rag()
+        db = _db
+    vectors = embeddings.embed_documents(queries)
+    result = _query_by_vectors(db, vectors)
+    return [
+        [Document(page_content=text, metadata=metadata or {}) for text, metadata in zip(texts, metadatas)]
+        for texts, metadatas in zip(result["documents"], result["metadatas"])
+    ]
+
+
+_batcher = QueryBatcher(
+    _search,
+    window_ms=settings.RETRIEVAL_BATCH_WINDOW_MS,
+    max_batch=settings.RETRIEVAL_MAX_BATCH,
+    timeout=settings.API_TIMEOUT,
+)
+
 # -----------------------------
 # Internal initializer
 # -----------------------------
@@ -67,16 +109,14 @@ def _init_rag():
     This DOES NOT delete the DB.
     It only reloads latest data from disk.
     """
-    global _db, _retriever, _rag_chain
+    global _db, _rag_chain
 
     _db = Chroma(
         persist_directory=settings.CHROMA_DIR,
         collection_name=settings.CHROMA_COLLECTION,
-        embedding_function=cached_embeddings,
+        embedding_function=embeddings,
     )
 
-    _retriever = _db.as_retriever(search_kwargs={"k": 3})
-
     llm = GeminiLLM(
         model=settings.GEMINI_MODEL,
         streaming=False,
@@ -84,7 +124,7 @@ def _init_rag():
     )
 
     _rag_chain = (
-        {"context": _retriever, "question": RunnablePassthrough()}
+        {"context": RunnableLambda(_batcher.submit), "question": RunnablePassthrough()}
         | prompt
         | llm
     )
@@ -99,9 +139,8 @@ def restart_chatbot():
     - Picks up newly ingested documents
     - Clears in-memory chain
     """
-    global _db, _retriever, _rag_chain
+    global _db, _rag_chain
     _db = None
-    _retriever = None
     _rag_chain = None
     _init_rag()
 
@@ -115,3 +154,10 @@ def invoke(query: str, session_id: str = None):
 
     config = {"configurable": {"thread_id": session_id}} if session_id else None
     return _rag_chain.invoke(query, config=config)
+
+
+def retrieval_stats():
+    """
+    Batch size and latency metrics of the retrieval batcher.
+    """
+    return _batcher.stats()
@@ -23,6 +23,16 @@ class Settings:
     PORT: int = int(os.getenv("PORT", "8000"))
     API_TIMEOUT: int = int(os.getenv("API_TIMEOUT", "60"))
     GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-2.5-flash-lite")
+
+    # Micro-batching of retrieval queries across concurrent chat requests
+    RETRIEVAL_BATCH_WINDOW_MS: float = float(os.getenv("RETRIEVAL_BATCH_WINDOW_MS", "5"))
+    RETRIEVAL_MAX_BATCH: int = int(os.getenv("RETRIEVAL_MAX_BATCH", "16"))
+
+    # Retention policy for the background compaction job (0 disables a
+    # limit; negative values are clamped to 0 rather than deleting everything)
+    RETENTION_MAX_AGE_DAYS: float = max(0.0, float(os.getenv("RETENTION_MAX_AGE_DAYS", "0")))
+    RETENTION_MAX_BYTES: int = max(0, int(os.getenv("RETENTION_MAX_BYTES", "0")))
+    COMPACTION_INTERVAL: int = int(os.getenv("COMPACTION_INTERVAL", "3600"))
     
     # API Token storage (set dynamically from auth header)
     API_TOKEN: str = ""
@@ -0,0 +1,303 @@
+"""
+Document lifecycle: list, delete, re-ingest and compact.
+
+A document is a video and/or PDF sharing the same file stem (see
+`document_id`). Deleting one removes its chunks from Chroma, its source
+files in `Videos/` and `PDFs/`, and the transcript PDF derived from it.
+"""
+import os
+import sqlite3
+import threading
+import time
+from .ingest_pdf import document_id, get_db, document_chunk_ids, delete_document_chunks, ingest_pdf
+from .helper_function import create_pdf_from_text, PDF_FOLDER
+from .job_status import JOB_STATUS
+from ..chatbot import restart_chatbot
+from ..video_to_text import transcribe_video
+from ..config import settings
+from ..logger import get_logger
+
+_logger = get_logger("document_store")
+
+UPLOAD_FOLDER = os.path.join(os.getcwd(), 'Videos')
+VIDEO_EXTENSIONS = {'mp4', 'avi', 'mov', 'mkv', 'flv', 'wmv'}
+
+# Serialises lifecycle operations against each other
+_lock = threading.Lock()
+
+
+def _db():
+    return get_db(settings.CHROMA_COLLECTION, settings.CHROMA_DIR)
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def is_safe_id(doc_id):
+    """Reject ids that could escape `Videos/` or `PDFs/` when joined."""
+    if not doc_id or doc_id in (".", ".."):
+        return False
+    if doc_id != os.path.basename(doc_id):
+        return False
+    return not any(sep and sep in doc_id for sep in (os.sep, os.altsep, "/", "\\"))
+
+
+def _store_size():
+    """Bytes used by the vector store plus source files."""
+    return _dir_size(settings.CHROMA_DIR) + _dir_size(UPLOAD_FOLDER) + _dir_size(PDF_FOLDER)
+
+
+def _media_files(folder, extensions):
+    """Yield (stem, path) for files in `folder` with one of `extensions`."""
+    if not os.path.isdir(folder):
+        return
+    for name in os.listdir(folder):
+        stem, _, ext = name.rpartition('.')
+        path = os.path.join(folder, name)
+        if stem and ext.lower() in extensions and os.path.isfile(path):
+            yield stem, path
+
+
+def _pdf_path(doc_id):
+    """The document's PDF on disk, matching the extension in any case."""
+    for stem, path in _media_files(PDF_FOLDER, {'pdf'}):
+        if stem == doc_id:
+            return path
+    return os.path.join(PDF_FOLDER, f"{doc_id}.pdf")
+
+
+def source_files(doc_id):
+    """Return the video and PDF files on disk belonging to a document."""
+    if not is_safe_id(doc_id):
+        return []
+    files = [path for stem, path in _media_files(UPLOAD_FOLDER, VIDEO_EXTENSIONS) if stem == doc_id]
+    files += [path for stem, path in _media_files(PDF_FOLDER, {'pdf'}) if stem == doc_id]
+    return files
+
+
+def list_documents():
+    """
+    List every known document.
+
+    Returns:
+        list[dict]: One entry per document with its chunk count, files,
+        size on disk and ingestion time (oldest first)
+    """
+    documents = {}
+
+    def entry(doc_id):
+        return documents.setdefault(doc_id, {
+            "doc_id": doc_id,
+            "chunks": 0,
+            "files": [],
+            "bytes": 0,
+            "ingested_at": None,
+        })
+
+    metadatas = _db().get(include=["metadatas"])["metadatas"]
+    for metadata in metadatas:
+        metadata = metadata or {}
+        doc_id = metadata.get("doc_id") or document_id(metadata.get("source", ""))
+        if not doc_id:
+            continue
+        doc = entry(doc_id)
+        doc["chunks"] += 1
+        if metadata.get("ingested_at"):
+            doc["ingested_at"] = max(doc["ingested_at"] or 0, metadata["ingested_at"])
+
+    # Only media files make a document; stray files (.DS_Store, notes)
+    # are neither listed nor touched by compaction
+    for folder, extensions in ((UPLOAD_FOLDER, VIDEO_EXTENSIONS), (PDF_FOLDER, {'pdf'})):
+        for stem, _ in _media_files(folder, extensions):
+            entry(stem)
+
+    for doc in documents.values():
+        doc["files"] = source_files(doc["doc_id"])
+        doc["bytes"] = sum(os.path.getsize(path) for path in doc["files"])
+        if doc["ingested_at"] is None and doc["files"]:
+            # Legacy chunks carry no timestamp; fall back to the file age
+            doc["ingested_at"] = min(os.path.getmtime(path) for path in doc["files"])
+
+    return sorted(documents.values(), key=lambda doc: doc["ingested_at"] or 0)
+
+
+def _delete(doc_id, db):
+    pdf_path = _pdf_path(doc_id)
+    vectors = delete_document_chunks(db, doc_id, pdf_path)
+    freed = 0
+    for path in source_files(doc_id):
+        freed += os.path.getsize(path)
+        os.remove(path)
+    _logger.info(f"Deleted document '{doc_id}': {vectors} vectors, {freed} bytes of files")
+    return {"doc_id": doc_id, "vectors": vectors, "bytes": freed}
+
+
+def _exists(doc_id, db):
+    if not is_safe_id(doc_id):
+        return False
+    pdf_path = _pdf_path(doc_id)
+    return bool(source_files(doc_id) or document_chunk_ids(db, doc_id, pdf_path))
+
+
+def delete_document(doc_id):
+    """
+    Delete a document's chunks, source files and transcript PDF.
+
+    Returns:
+        dict: Vectors and file bytes removed, or None if the document
+        does not exist
+    """
+    with _lock:
+        db = _db()
+        if not _exists(doc_id, db):
+            return None
+        result = _delete(doc_id, db)
+    restart_chatbot()
+    return result
+
+
+def reingest_document(doc_id, job_id=None):
+    """
+    Re-embed a document from its source files.
+
+    Videos are transcribed again and their transcript PDF rebuilt;
+    standalone PDFs are only re-embedded. Old chunks are replaced, not
+    duplicated.
+
+    Returns:
+        bool: True if successful
+    """
+    try:
+        files = source_files(doc_id)
+        if not files:
+            raise FileNotFoundError(f"No source file left for '{doc_id}'")
+        videos = [path for path in files if not path.lower().endswith(".pdf")]
+
+        if videos:
+            # Whisper runs outside the lock; it can take minutes
+            transcript_text = transcribe_video(videos[0])
+            if isinstance(transcript_text, Exception):
+                raise transcript_text
+
+        with _lock:
+            if not all(os.path.isfile(path) for path in files):
+                raise FileNotFoundError(f"'{doc_id}' was deleted during re-ingest")
+            if videos:
+                pdf_path = create_pdf_from_text(transcript_text, os.path.basename(videos[0]))
+            else:
+                pdf_path = files[0]
+            success = ingest_pdf(pdf_path, settings.CHROMA_COLLECTION, settings.CHROMA_DIR)
+
+        if job_id and job_id in JOB_STATUS:
+            JOB_STATUS[job_id]["status"] = "success" if success else "failed"
+            JOB_STATUS[job_id]["message"] = "Re-ingest completed" if success else "Re-ingest failed"
+        restart_chatbot()
+        return success
+
+    except Exception as e:
+        if job_id and job_id in JOB_STATUS:
+            JOB_STATUS[job_id]["status"] = "failed"
+            JOB_STATUS[job_id]["message"] = str(e)
+        _logger.error(f"Error re-ingesting '{doc_id}': {str(e)}")
+        return False
+
+
+def _vacuum():
+    """Shrink Chroma's SQLite file so deleted rows give their space back."""
+    sqlite_path = os.path.join(settings.CHROMA_DIR, "chroma.sqlite3")
+    if not os.path.isfile(sqlite_path):
+        return
+    try:
+        conn = sqlite3.connect(sqlite_path)
+        try:
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        _logger.warning(f"Chroma VACUUM skipped: {e}")
+
+
+def compact_store(max_age_days=None, max_bytes=None):
+    """
+    Apply the retention policy and compact the vector store.
+
+    Documents older than `max_age_days` are deleted, then the oldest
+    remaining documents are deleted until the store plus source files fit
+    in `max_bytes`. The size policy never deletes the newest document and
+    stops as soon as a deletion fails to shrink the store. A value of 0
+    disables that limit; None uses settings. Negative limits are rejected.
+
+    Returns:
+        dict: Deleted document ids, vectors reclaimed and bytes reclaimed
+    """
+    if max_age_days is None:
+        max_age_days = settings.RETENTION_MAX_AGE_DAYS
+    if max_bytes is None:
+        max_bytes = settings.RETENTION_MAX_BYTES
+    if max_age_days < 0 or max_bytes < 0:
+        raise ValueError("Retention limits must not be negative")
+
+    started = time.time()
+    with _lock:
+        before = _store_size()
+        db = _db()
+        documents = list_documents()
+        deleted = []
+        vectors = 0
+
+        if max_age_days:
+            cutoff = started - max_age_days * 86400
+            for doc in documents:
+                if doc["ingested_at"] is not None and doc["ingested_at"] < cutoff:
+                    vectors += _delete(doc["doc_id"], db)["vectors"]
+                    deleted.append(doc["doc_id"])
+
+        if vectors:
+            _vacuum()
+
+        if max_bytes:
+            # Chroma's HNSW segment files do not shrink on delete, so the
+            # real size is measured after every deletion and VACUUM. The
+            # newest document is always kept.
+            size = _store_size()
+            for doc in documents[:-1]:
+                if size <= max_bytes:
+                    break
+                if doc["doc_id"] in deleted or not (doc["files"] or doc["chunks"]):
+                    continue
+                result = _delete(doc["doc_id"], db)
+                vectors += result["vectors"]
+                deleted.append(doc["doc_id"])
+                if result["vectors"]:
+                    _vacuum()
+                new_size = _store_size()
+                if new_size >= size:
+                    _logger.warning(
+                        f"Deleting '{doc['doc_id']}' did not shrink the store "
+                        f"({new_size} bytes); RETENTION_MAX_BYTES={max_bytes} "
+                        f"may be below the store's minimum size"
+                    )
+                    break
+                size = new_size
+
+        after = _store_size()
+
+    if deleted:
+        restart_chatbot()
+
+    report = {
+        "deleted": deleted,
+        "vectors_reclaimed": vectors,
+        "bytes_reclaimed": max(before - after, 0),
+        "duration": round(time.time() - started, 3),
+    }
+    _logger.info(f"Compaction finished: {report}")
+    return report
@@ -1,3 +1,5 @@
+import os
+import time
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
@@ -8,10 +10,55 @@ logger = get_logger("ingest_pdf")
 # Initialize embeddings once at module level
 embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
 
+
+def document_id(path):
+    """
+    Derive the document id for a source file.
+
+    A video and the transcript PDF generated from it share the same id,
+    so the id is the file name without its extension.
+    """
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def get_db(collection_name="project_kb", db_path="./chroma_db"):
+    """Open the Chroma collection used for ingestion."""
+    return Chroma(collection_name=collection_name, embedding_function=embeddings, persist_directory=db_path)
+
+
+def document_chunk_ids(db, doc_id, pdf_path=None):
+    """
+    Return the ids of every chunk belonging to a document.
+
+    Chunks ingested before ids were tracked only carry a `source`
+    metadata field, so those are matched by PDF path as well.
+    """
+    ids = set(db.get(where={"doc_id": doc_id}, include=[])["ids"])
+    if pdf_path:
+        ids.update(db.get(where={"source": pdf_path}, include=[])["ids"])
+    return ids
+
+
+def delete_document_chunks(db, doc_id, pdf_path=None):
+    """
+    Remove every chunk belonging to a document.
+
+    Returns:
+        int: Number of vectors removed
+    """
+    ids = document_chunk_ids(db, doc_id, pdf_path)
+    if ids:
+        db.delete(ids=list(ids))
+    return len(ids)
+
+
 def ingest_pdf(pdf_path, collection_name="project_kb", db_path="./chroma_db"):
     """
     Ingest PDF into Chroma vector database
-    
+
+    Existing chunks of the same document are replaced, so ingesting a
+    file twice does not duplicate it.
+
     Args:
         pdf_path: Path to the PDF file
         collection_name: Name of the Chroma collection
@@ -27,9 +74,21 @@ def ingest_pdf(pdf_path, collection_name="project_kb", db_path="./chroma_db"):
         splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
         chunks = splitter.split_documents(docs)
 
-        db = Chroma(collection_name=collection_name, embedding_function=embeddings, persist_directory=db_path)
-        db.add_documents(chunks)
-        db.persist()
+        doc_id = document_id(pdf_path)
+        ingested_at = time.time()
+        for chunk in chunks:
+            chunk.metadata["doc_id"] = doc_id
+            chunk.metadata["ingested_at"] = ingested_at
+
+        db = get_db(collection_name, db_path)
+        # Add the new chunks before dropping the old ones, so a failed
+        # embedding leaves the previous version searchable
+        old_ids = document_chunk_ids(db, doc_id, pdf_path)
+        new_ids = db.add_documents(chunks)
+        old_ids.difference_update(new_ids)
+        if old_ids:
+            db.delete(ids=list(old_ids))
+            logger.info(f"Replaced {len(old_ids)} existing chunks of '{doc_id}'")
 
         logger.info(f" PDF '{pdf_path}' embedded & stored!")
         return True
@@ -0,0 +1,114 @@
+"""Micro-batching of retrieval queries across concurrent chat requests.
+
+Chat requests run on executor threads and each used to embed its query
+alone. `QueryBatcher` collects queries arriving within a short window (or
+up to a maximum batch size), hands them to a batched search function in
+one call, and fans the results back out to the waiting callers.
+"""
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Callable, List
+
+from .logger import get_logger
+
+_logger = get_logger("query_batcher")
+
+
+class QueryBatcher:
+    """Coalesce concurrent queries into batched search calls.
+
+    Args:
+        search_fn: Takes a list of queries and returns one result per query,
+            in the same order
+        window_ms: How long to wait for more queries after the first arrives
+        max_batch: Dispatch immediately once this many queries are waiting
+        timeout: Seconds a caller waits for its result before giving up
+    """
+
+    def __init__(self, search_fn: Callable[[List[str]], list], window_ms: float = 5, max_batch: int = 16,
+                 timeout: float = 60):
+        self.search_fn = search_fn
+        self.window = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._queries = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._search_total = 0.0
+
+    def submit(self, query: str):
+        """Queue a query and block until its batch has been searched."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((query, time.perf_counter(), future))
+        return future.result(timeout=self.timeout)
+
+    def stats(self) -> dict:
+        """Snapshot of batch size distribution and latency added by batching."""
+        with self._lock:
+            batches = sum(self._batch_sizes.values())
+            return {
+                "batches": batches,
+                "queries": self._queries,
+                "avg_batch_size": round(self._queries / batches, 2) if batches else 0,
+                "batch_sizes": dict(sorted(self._batch_sizes.items())),
+                "avg_wait_ms": round(self._wait_total / self._queries * 1000, 3) if self._queries else 0,
+                "max_wait_ms": round(self._wait_max * 1000, 3),
+                "avg_search_ms": round(self._search_total / batches * 1000, 3) if batches else 0,
+            }
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+                    self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        try:
+            self._search(batch)
+        except Exception as e:
+            _logger.error(f"Batched search failed for {len(batch)} queries: {e}")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _search(self, batch):
+        started = time.perf_counter()
+        results = list(self.search_fn([query for query, _, _ in batch]))
+        if len(results) != len(batch):
+            raise RuntimeError(f"search_fn returned {len(results)} results for {len(batch)} queries")
+        finished = time.perf_counter()
+
+        with self._lock:
+            self._batch_sizes[len(batch)] += 1
+            self._queries += len(batch)
+            self._search_total += finished - started
+            for _, enqueued, _ in batch:
+                wait = started - enqueued
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
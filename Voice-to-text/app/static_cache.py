@@ -0,0 +1,113 @@
+"""In-memory, precompressed serving of the React bundle and HTML pages.
+
+Files are read once, compressed with gzip (and brotli when the `brotli`
+package is installed) and tagged with a content hash. Responses honour
+`Accept-Encoding` and `If-None-Match`, so repeat visits cost a 304.
+"""
+import gzip
+import hashlib
+import mimetypes
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:
+    # brotli not installed; serve gzip only
+    brotli = None
+
+# Vite puts a content hash in every asset filename, so they never change
+IMMUTABLE = "public, max-age=31536000, immutable"
+# HTML names the current asset hashes and must be revalidated on each load
+REVALIDATE = "no-cache"
+
+# Skip encodings that save less than this fraction (e.g. PNG images)
+_MIN_SAVING = 0.1
+
+
+class CachedFile:
+    """A response body held in memory with its compressed variants."""
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str):
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self.variants: Dict[str, bytes] = {"identity": body}
+        self._add("gzip", gzip.compress(body, compresslevel=9, mtime=0))
+        if brotli is not None:
+            self._add("br", brotli.compress(body, quality=11))
+
+    def _add(self, encoding: str, data: bytes):
+        if len(data) <= len(self.variants["identity"]) * (1 - _MIN_SAVING):
+            self.variants[encoding] = data
+
+    def etag(self, encoding: str) -> str:
+        """Strong validators must differ per representation, so each
+        encoding gets its own tag."""
+        if encoding == "identity":
+            return '"%s"' % self.digest
+        return '"%s-%s"' % (self.digest, encoding)
+
+    def _pick_encoding(self, accept_encoding: str) -> str:
+        qualities = {}
+        for part in accept_encoding.split(","):
+            name, _, params = part.partition(";")
+            quality = 1.0
+            for param in params.split(";"):
+                key, _, value = param.partition("=")
+                if key.strip().lower() == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            qualities[name.strip().lower()] = quality
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and qualities.get(encoding, qualities.get("*", 0.0)) > 0:
+                return encoding
+        return "identity"
+
+    def response(self, request: Request) -> Response:
+        encoding = self._pick_encoding(request.headers.get("accept-encoding", ""))
+        headers = {
+            "ETag": self.etag(encoding),
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        # Any variant's tag validates: the content behind them is identical
+        if_none_match = [tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")]
+        if "*" in if_none_match or any(self.etag(variant) in if_none_match for variant in self.variants):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        body = self.variants[encoding]
+        if request.method == "HEAD":
+            # Same headers as GET, including the length of the body not sent
+            headers["Content-Length"] = str(len(body))
+            body = b""
+        return Response(body, media_type=self.media_type, headers=headers)
+
+
+class StaticCache:
+    """Precompressed files keyed by URL path relative to their mount."""
+
+    def __init__(self):
+        self.files: Dict[str, CachedFile] = {}
+
+    def add_directory(self, directory: Path, cache_control: str = IMMUTABLE):
+        for path in sorted(directory.rglob("*")):
+            if path.is_file():
+                self.add_file(path.relative_to(directory).as_posix(), path, cache_control)
+
+    def add_file(self, key: str, path: Path, cache_control: str = REVALIDATE):
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        self.files[key] = CachedFile(path.read_bytes(), media_type, cache_control)
+
+    def add_html(self, key: str, html: str):
+        self.files[key] = CachedFile(html.encode("utf-8"), "text/html; charset=utf-8", REVALIDATE)
+
+    def get(self, key: str) -> Optional[CachedFile]:
+        return self.files.get(key)
@@ -0,0 +1,91 @@
+"""Benchmark plain StaticFiles/FileResponse serving against StaticCache.
+
+Requests every page and asset of the React build through an in-process
+client and reports bytes transferred and requests/s, for a first visit
+and for a revisit that sends back the validators it was given.
+
+Run from the Voice-to-text directory:
+
+  python benchmarks/static_serving.py --rounds 200
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from fastapi import FastAPI, Request
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from app.static_cache import StaticCache  # noqa: E402
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / "app" / "static"
+HEADERS = {"Accept-Encoding": "gzip, deflate, br"}
+
+
+def plain_app():
+    app = FastAPI()
+    app.mount("/assets", StaticFiles(directory=STATIC_DIR / "assets"), name="assets")
+
+    @app.get("/")
+    async def index():
+        return FileResponse(STATIC_DIR / "index.html")
+
+    return app
+
+
+def cached_app():
+    app = FastAPI()
+    assets = StaticCache()
+    assets.add_directory(STATIC_DIR / "assets")
+    pages = StaticCache()
+    pages.add_file("index.html", STATIC_DIR / "index.html")
+
+    @app.get("/assets/{path:path}")
+    async def asset(path: str, request: Request):
+        return assets.get(path).response(request)
+
+    @app.get("/")
+    async def index(request: Request):
+        return pages.get("index.html").response(request)
+
+    return app
+
+
+def run(app, urls, rounds, revisit):
+    client = TestClient(app)
+    validators = {}
+    for url in urls:
+        response = client.get(url, headers=HEADERS)
+        validators[url] = {"If-None-Match": response.headers.get("etag", "")}
+
+    transferred = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for url in urls:
+            headers = {**HEADERS, **validators[url]} if revisit else HEADERS
+            response = client.get(url, headers=headers)
+            transferred += response.num_bytes_downloaded
+    elapsed = time.perf_counter() - started
+    requests = rounds * len(urls)
+    return transferred / rounds, requests / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=100)
+    args = parser.parse_args()
+
+    urls = ["/"] + [f"/assets/{path.name}" for path in sorted((STATIC_DIR / "assets").iterdir())]
+    print(f"{'server':<8} {'visit':<8} {'bytes/page load':>16} {'req/s':>10}")
+    for name, factory in (("plain", plain_app), ("cached", cached_app)):
+        for revisit in (False, True):
+            per_load, rate = run(factory(), urls, args.rounds, revisit)
+            visit = "revisit" if revisit else "first"
+            print(f"{name:<8} {visit:<8} {per_load:>16,.0f} {rate:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()